@@ -1,110 +1,252 @@
+from threading import Lock
 from typing import List, Optional
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, func, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import models, schemas
 
-#combines your @Service and @Repository layers from Java.
-class BookRepository:
-    """Repository class for book operations combining service and data access layers."""
-    # Combines BookService + BookRepository from Java
-    # In Python, we often merge these layers for simpler APIs
-  
-def get_all_books(self, db: Session, skip: int = 0, limit: int = 100) -> List[models.Book]:
-        """Get all books Like: List<Book> findAll()
-        Added pagination (like Spring Data's Pageable)."""
-        return db.query(models.Book).offset(skip).limit(limit).all()
-
-def get_book_by_id(self, db: Session, book_id: int) -> Optional[models.Book]:
-        """Get a book by its ID."""
-        return db.query(models.Book).filter(models.Book.id == book_id).first()
-        # Like: public Optional<Book> findById(int id)
-
-def get_book_by_isbn(self, db: Session, isbn: str):
-        """Get a book by its ISBN."""
-        return db.query(models.Book).filter(models.Book.isbn == isbn).first()
-
-def create_book(self, db: Session, book: schemas.BookCreate):
-        """Create a new book in the database."""
-         # Convert Pydantic model to SQLAlchemy model
-        # book.model_dump() is like BeanUtils.copyProperties()
-        db_book = models.Book(**book.model_dump())
-
-        # Add to session (like entityManager.persist())
-        db.add(db_book)
-         # Commit transaction (like @Transactional)
-        db.commit()
-        # Refresh to get the ID (like entityManager.refresh())
-        db.refresh(db_book)
-        return db_book
-
-def search_books(self, db: Session, search_term: str) -> List[models.Book]:
-        """Search books by title or author."""
-        return db.query(models.Book).filter(
+# Combines your @Service and @Repository layers from Java.
+# Plain module-level functions instead of a repository class: FastAPI injects
+# the Session per request anyway, so a singleton object only added an extra
+# attribute lookup (and a broken `self`) on every call.
+# Everything is async: each await releases the event loop while the query is
+# on the wire, instead of pinning one of FastAPI's threadpool workers.
+
+# In-process read cache for the by-key lookups (like Spring's @Cacheable).
+# Books rarely change, so a 30s TTL removes the DB round-trip entirely on
+# repeat reads. We cache serialized dicts, never ORM objects - those are
+# bound to the session that loaded them.
+_BOOK_CACHE = TTLCache(maxsize=10_000, ttl=30)
+_BOOK_CACHE_LOCK = Lock()
+
+def _cache_book(row: models.Book) -> dict:
+    """Serialize a row, store it under both its keys, and return the dict."""
+    data = schemas.BookResponse.model_validate(row).model_dump()
+    with _BOOK_CACHE_LOCK:
+        _BOOK_CACHE[("id", data["id"])] = data
+        if data["isbn"]:
+            _BOOK_CACHE[("isbn", data["isbn"])] = data
+    return data
+
+def _invalidate_book_cache(book_id: int):
+    """Drop a book's cache entries after a write (like @CacheEvict)."""
+    with _BOOK_CACHE_LOCK:
+        entry = _BOOK_CACHE.pop(("id", book_id), None)
+        if entry and entry.get("isbn"):
+            _BOOK_CACHE.pop(("isbn", entry["isbn"]), None)
+
+# Prepared statements for the hottest lookups - built once at import time so
+# every call reuses the same compiled SQL from the statement cache and only
+# rebinds the parameter (like a named query in JPA).
+_GET_BY_ID = select(models.Book).where(models.Book.id == bindparam("id"))
+_GET_BY_ISBN = select(models.Book).where(models.Book.isbn == bindparam("isbn"))
+
+def _book_query():
+    """Base select every multi-row book query builds on.
+
+    When relationships (Author, Publisher, ...) land on Book, add
+    .options(selectinload(models.Book.<rel>)) here once and every list
+    endpoint stays N+1-free - one extra SELECT per page instead of one
+    per row. Declare those relationships with lazy="raise" so any lazy
+    load that slips past this helper fails loudly instead of silently
+    issuing a query per row.
+    """
+    return select(models.Book)
+
+async def get_all_books(db: AsyncSession, skip: int = 0, limit: int = 100,
+                        after_id: Optional[int] = None) -> List[models.Book]:
+    """Get all books Like: List<Book> findAll()
+    Added pagination (like Spring Data's Pageable).
+
+    Prefer after_id (keyset pagination): WHERE id > :after_id walks only
+    `limit` index entries no matter how deep the page, while OFFSET makes
+    the database scan and throw away `skip` rows first. `skip` is kept as
+    a deprecated fallback for old callers.
+    """
+    stmt = _book_query().order_by(models.Book.id).limit(limit)
+    if after_id is not None:
+        stmt = stmt.where(models.Book.id > after_id)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return (await db.execute(stmt)).scalars().all()
+
+async def count_books(db: AsyncSession) -> int:
+    """Count all books Like: long count()
+    A single SELECT COUNT(*) - no rows are hydrated into ORM objects."""
+    return await db.scalar(select(func.count(models.Book.id)))
+
+async def get_book_by_id(db: AsyncSession, book_id: int) -> Optional[dict]:
+    """Get a book by its ID, via the TTL cache."""
+    with _BOOK_CACHE_LOCK:
+        cached = _BOOK_CACHE.get(("id", book_id))
+    if cached is not None:
+        return cached
+    row = (await db.execute(_GET_BY_ID, {"id": book_id})).scalar_one_or_none()
+    return _cache_book(row) if row is not None else None
+    # Like: public Optional<Book> findById(int id)
+
+async def get_book_by_isbn(db: AsyncSession, isbn: str) -> Optional[dict]:
+    """Get a book by its ISBN, via the TTL cache."""
+    with _BOOK_CACHE_LOCK:
+        cached = _BOOK_CACHE.get(("isbn", isbn))
+    if cached is not None:
+        return cached
+    row = (await db.execute(_GET_BY_ISBN, {"isbn": isbn})).scalar_one_or_none()
+    return _cache_book(row) if row is not None else None
+
+async def create_book(db: AsyncSession, book: schemas.BookCreate):
+    """Create a new book in the database.
+
+    Duplicate ISBNs are rejected by the UNIQUE constraint, not a SELECT
+    pre-check - one round-trip on the happy path instead of two, and no
+    race window between check and insert.
+    """
+    # Convert Pydantic model to SQLAlchemy model
+    # book.model_dump() is like BeanUtils.copyProperties()
+    db_book = models.Book(**book.model_dump())
+
+    # Add to session (like entityManager.persist())
+    db.add(db_book)
+    try:
+        # Commit transaction (like @Transactional)
+        await db.commit()
+    except IntegrityError:
+        # Like catching DataIntegrityViolationException in Spring
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Book with ISBN {book.isbn} already exists"
+        )
+    # Refresh to get the ID (like entityManager.refresh())
+    await db.refresh(db_book)
+    return db_book
+
+async def bulk_create_books(db: AsyncSession, books: List[schemas.BookCreate]) -> int:
+    """Insert many books in one go Like: saveAll(List<Book>)
+
+    A single executemany through insertmanyvalues (pages of 1000 rows per
+    INSERT on the pooled engine) instead of N add()+commit() round-trips.
+    """
+    if not books:
+        return 0
+
+    try:
+        await db.execute(insert(models.Book), [b.model_dump() for b in books])
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk insert contains a duplicate ISBN"
+        )
+    return len(books)
+
+async def search_books(db: AsyncSession, search_term: str) -> List[models.Book]:
+    """Search books by title or author.
+
+    On PostgreSQL this queries the search_tsv generated column (see
+    create_tables) through its GIN index - a single inverted-index lookup
+    instead of two ILIKE scans, immune to %/_ wildcards in user input.
+
+    Terms shorter than 3 characters are rejected here too (the router
+    already 400s them): below the trigram minimum the index can't help
+    and the query degenerates to a full scan. Results are capped at 200
+    so a common term can't make us hydrate the whole table.
+    """
+    search_term = search_term.strip()
+    if len(search_term) < 3:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must be at least 3 characters long"
+        )
+
+    if db.get_bind().dialect.name == "postgresql":
+        result = await db.execute(
+            _book_query().filter(
+                text("search_tsv @@ plainto_tsquery('simple', :q)")
+            ).params(q=search_term).limit(200)
+        )
+        return result.scalars().all()
+
+    # SQLite fallback - escape LIKE wildcards so user input stays literal
+    escaped = (search_term.replace("\\", "\\\\")
+                          .replace("%", "\\%")
+                          .replace("_", "\\_"))
+    result = await db.execute(
+        _book_query().filter(
             or_(
                 # ilike() is case-insensitive LIKE (PostgreSQL style)
-                models.Book.title.ilike(f"%{search_term}%"),
-                models.Book.author.ilike(f"%{search_term}%")
+                models.Book.title.ilike(f"%{escaped}%", escape="\\"),
+                models.Book.author.ilike(f"%{escaped}%", escape="\\")
             )
-        ).all()
-
-def update_book(self, db: Session, book_id: int, book: schemas.BookUpdate) -> Optional[models.Book]:
-        """Update a book by its ID
-
-        Spring Boot equivalent:
-        @PutMapping("/books/{id}")
-        public ResponseEntity<Book> updateBook(@PathVariable Long id,
-                                             @RequestBody BookUpdateDTO bookDto) {
-            Optional<Book> optionalBook = bookRepository.findById(id);
-            if (optionalBook.isPresent()) {
-                Book existingBook = optionalBook.get();
-                BeanUtils.copyProperties(bookDto, existingBook, getNullPropertyNames(bookDto));
-                return ResponseEntity.ok(bookRepository.save(existingBook));
-            }
-            return ResponseEntity.notFound().build();
-        }
-        """
-        # Find the existing book
-        db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
-
-        if db_book:
-            # Update only non-None fields (partial update)
-            # This is like Spring's @DynamicUpdate
-            book_data = book.model_dump(exclude_unset=True)  # Only include set fields
-            for field, value in book_data.items():
-                setattr(db_book, field, value)  # Like reflection in Java
-
-            db.commit()
-            db.refresh(db_book)
-            return db_book
-
-        return None
-
-def delete_book(self, db: Session, book_id: int) -> bool:
-        """Delete a book by its ID
-
-        Spring Boot equivalent:
-        @DeleteMapping("/books/{id}")
-        public ResponseEntity<Void> deleteBook(@PathVariable Long id) {
-            if (bookRepository.existsById(id)) {
-                bookRepository.deleteById(id);
-                return ResponseEntity.noContent().build();
-            }
-            return ResponseEntity.notFound().build();
+        ).limit(200)
+    )
+    return result.scalars().all()
+
+async def update_book(db: AsyncSession, book_id: int, book: schemas.BookUpdate):
+    """Update a book by its ID
+
+    Spring Boot equivalent:
+    @PutMapping("/books/{id}")
+    public ResponseEntity<Book> updateBook(@PathVariable Long id,
+                                         @RequestBody BookUpdateDTO bookDto) {
+        Optional<Book> optionalBook = bookRepository.findById(id);
+        if (optionalBook.isPresent()) {
+            Book existingBook = optionalBook.get();
+            BeanUtils.copyProperties(bookDto, existingBook, getNullPropertyNames(bookDto));
+            return ResponseEntity.ok(bookRepository.save(existingBook));
         }
-        """
-        db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
+        return ResponseEntity.notFound().build();
+    }
+    """
+    # Update only set fields (partial update)
+    # This is like Spring's @DynamicUpdate
+    book_data = book.model_dump(exclude_unset=True)  # Only include set fields
 
-        if db_book:
-            db.delete(db_book)  # Like entityManager.remove()
-            db.commit()
-            return True
+    if not book_data:
+        # Nothing to change - just return the current row
+        return await get_book_by_id(db, book_id)
 
-        return False
+    # Single UPDATE ... RETURNING round-trip instead of SELECT + UPDATE +
+    # refresh SELECT; no ORM object is hydrated just to overwrite it
+    stmt = (
+        update(models.Book)
+        .where(models.Book.id == book_id)
+        .values(**book_data)
+        .returning(models.Book)
+    )
+    db_book = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
+    if db_book is not None:
+        _invalidate_book_cache(book_id)
+    return db_book
 
-# Create a singleton instance (like @Component in Spring)
-book_repository = BookRepository()
+async def delete_book(db: AsyncSession, book_id: int) -> bool:
+    """Delete a book by its ID
+
+    Spring Boot equivalent:
+    @DeleteMapping("/books/{id}")
+    public ResponseEntity<Void> deleteBook(@PathVariable Long id) {
+        if (bookRepository.existsById(id)) {
+            bookRepository.deleteById(id);
+            return ResponseEntity.noContent().build();
+        }
+        return ResponseEntity.notFound().build();
+    }
+    """
+    # Single DELETE round-trip - no point hydrating a row just to discard it;
+    # synchronize_session=False skips the identity-map scan too
+    result = await db.execute(
+        delete(models.Book).where(models.Book.id == book_id),
+        execution_options={"synchronize_session": False}
+    )
+    await db.commit()
+    _invalidate_book_cache(book_id)
+    return result.rowcount > 0
 
 """
 ## Key Python vs Spring Boot Concepts:
@@ -112,12 +254,12 @@ book_repository = BookRepository()
 ### 1. Dependency Injection
 
 • Spring Boot: @Autowired automatically injects dependencies
-• Python/FastAPI: We pass db: Session explicitly to each method
+• Python/FastAPI: We pass db: AsyncSession explicitly to each function
 
 ### 2. Transaction Management
 
 • Spring Boot: @Transactional handles commit/rollback automatically
-• Python: We manually call db.commit() and can handle rollbacks
+• Python: We manually call await db.commit() and can handle rollbacks
 
 ### 3. Data Conversion
 
@@ -137,4 +279,3 @@ book_repository = BookRepository()
 The main difference is that Python is more explicit - you see exactly what's happening with database sessions,
 commits, and data conversion, while Spring Boot hides much of this behind annotations and conventions.
 """
-
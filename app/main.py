@@ -1,29 +1,50 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from .database import create_tables
 from .routers import books  # Import the books router
 
+# Lifespan context - like @PostConstruct / @PreDestroy in one place.
+# Replaces the deprecated @app.on_event("startup") hook.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Set AUTO_CREATE_TABLES=0 in production where Alembic owns the schema -
+    # every uvicorn worker would otherwise repeat the same DDL checks
+    if os.getenv("AUTO_CREATE_TABLES", "1") == "1":
+        await create_tables()
+    yield
+
 # Create FastAPI app - like @SpringBootApplication
 app = FastAPI(
     title="Bookstore API",
     description="A simple bookstore API built with FastAPI",
     version="1.0.0",
     docs_url="/docs",  # Swagger UI at /docs
-    redoc_url="/redoc"  # ReDoc at /redoc
+    redoc_url="/redoc",  # ReDoc at /redoc
+    default_response_class=ORJSONResponse,  # orjson is 2-5x faster than stdlib json
+    lifespan=lifespan
 )
 
+# Request-scoped DB session - like OpenEntityManagerInViewFilter, but lazy.
+# get_db() only creates the session when a handler actually asks for it, so
+# /health and friends never check out a connection; whatever was created is
+# closed here once the response is finished.
+@app.middleware("http")
+async def db_session_middleware(request, call_next):
+    request.state.db = None
+    try:
+        response = await call_next(request)
+    finally:
+        if request.state.db is not None:
+            await request.state.db.close()
+    return response
+
 # Include routers - like @ComponentScan or @Import
 app.include_router(books.router, prefix="/api")
 
-# Create database tables on startup - like @PostConstruct
-@app.on_event("startup")
-def startup_event():
-    """
-    Run when application starts
-    Like: @EventListener(ApplicationReadyEvent.class)
-    """
-    create_tables()
-
 # Health check endpoints
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, DateTime, String, Integer, func
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -13,10 +13,13 @@ class Book(Base):
 
     author = Column(String(100), nullable=False)
 
-    isbn = Column(String(13), unique=True, nullable=True)
+    isbn = Column(String(13), unique=True, index=True, nullable=True)
 
     published_year = Column(Integer, nullable=True)
 
+    # Like @UpdateTimestamp - feeds the ETag on the by-key GET endpoints
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
 
     ## Key Concepts Explained:
 """
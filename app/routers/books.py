@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException,status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response,status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
-from ..crud import book_repository
+from .. import crud
 from .. import schemas
 
-from typing import List
+from typing import List, Optional
 
 # Create router - like @RestController + @RequestMapping("/books")
 router = APIRouter(
@@ -14,35 +14,111 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-# GET /books - Get all books with pagination
-@router.get("/", response_model=List[schemas.BookResponse])
-def get_books(
-    skip: int = 0,  # Like @RequestParam(defaultValue = "0") int page
+_CACHE_CONTROL = "public, max-age=60"
+
+def _book_etag(book: dict) -> str:
+    """Weak ETag from (id, updated_at) - changes whenever the row does."""
+    ts = book.get("updated_at")
+    return f'W/"{book["id"]}-{int(ts.timestamp()) if ts else 0}"'
+
+def _not_modified(etag: str) -> Response:
+    """304 with the validator headers - client reuses its cached body."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    )
+
+# GET /books - Get all books with keyset pagination
+# response_model=None: serialize_books already validated the page, so
+# FastAPI's own response_model pass would only repeat the work. The page
+# shape is still documented in OpenAPI via responses= - keep BookListResponse
+# in sync with the dict built below
+@router.get("/", response_model=None,
+            responses={200: {"model": schemas.BookListResponse}})
+async def get_books(
+    after_id: Optional[int] = None,  # Keyset cursor - pass next_after_id from the previous page
     limit: int = 100,  # Like @RequestParam(defaultValue = "100") int size
-    db: Session = Depends(get_db)  # Like @Autowired EntityManager em
+    skip: int = 0,  # Deprecated: OFFSET scans and discards `skip` rows - use after_id
+    db: AsyncSession = Depends(get_db)  # Like @Autowired EntityManager em
+):
+    books = await crud.get_all_books(db, skip=skip, limit=limit, after_id=after_id)
+    return {
+        "items": schemas.serialize_books(books),
+        "next_after_id": books[-1].id if books else None
+    }
+
+# Fixed literal paths must be registered BEFORE /{book_id} or FastAPI
+# matches them as a book_id and returns 422 (see "Route Order Matters" below)
+
+# GET /books/search?q=term - Search books
+@router.get("/search", response_model=None)
+async def search_books(
+    q: str,  # Like @RequestParam String query
+    db: AsyncSession = Depends(get_db)
 ):
-    books = book_repository.get_all_books(db, skip=skip, limit=limit)
-    return books
+    """
+    Search books by title or author
+
+    Spring Boot equivalent:
+    @GetMapping("/search")
+    public List<BookDTO> searchBooks(@RequestParam String q)
+    """
+    # 3 is the pg_trgm minimum - anything shorter can't use the trigram
+    # index and would fall back to a sequential scan
+    if len(q.strip()) < 3:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must be at least 3 characters long"
+        )
+
+    return schemas.serialize_books(await crud.search_books(db, search_term=q))
+
+# GET /books/stats - Get book statistics (bonus endpoint)
+@router.get("/stats")
+async def get_book_stats(db: AsyncSession = Depends(get_db)):
+    """
+    Get basic statistics about books
+
+    Spring Boot equivalent:
+    @GetMapping("/stats")
+    public BookStatsDTO getBookStats()
+    """
+    # SELECT COUNT(*) in the database - one integer over the wire instead of
+    # hydrating thousands of Book objects just to len() them
+    total_books = await crud.count_books(db)
+
+    return {
+        "total_books": total_books,
+        "message": f"Database contains {total_books} books"
+    }
 
 # GET /books/{book_id} - Get single book by ID
 @router.get("/{book_id}", response_model=schemas.BookResponse)
-def get_book(
+async def get_book(
     book_id: int,  # Like @PathVariable Long bookId
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    book = book_repository.get_book_by_id(db, book_id=book_id)
+    book = await crud.get_book_by_id(db, book_id=book_id)
     if book is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Book with id {book_id} not found"
         )
+    # Conditional GET: matching If-None-Match skips serialization entirely
+    etag = _book_etag(book)
+    if request.headers.get("if-none-match") == etag:
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
     return book
 
 # POST /books - Create a new book
 @router.post("/", response_model=schemas.BookResponse, status_code=status.HTTP_201_CREATED)
-def create_book(
+async def create_book(
     book: schemas.BookCreate,  # Like @RequestBody @Valid BookCreateDTO
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new book
@@ -52,23 +128,35 @@ def create_book(
     @ResponseStatus(HttpStatus.CREATED)
     public BookDTO createBook(@RequestBody @Valid BookCreateDTO bookDto)
     """
-    # Check if ISBN already exists (business logic validation)
-    if book.isbn:
-        existing_book = book_repository.get_book_by_isbn(db, isbn=book.isbn)
-        if existing_book:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Book with ISBN {book.isbn} already exists"
-            )
+    # Duplicate ISBNs are handled by the UNIQUE constraint in crud.create_book
+    # (no SELECT pre-check - saves a round-trip and avoids a race)
+    return await crud.create_book(db=db, book=book)
+
+# POST /books/bulk - Create many books in one request
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def bulk_create_books(
+    books: List[schemas.BookCreate],  # Like @RequestBody List<BookCreateDTO>
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many books in a single batched INSERT
 
-    return book_repository.create_book(db=db, book=book)
+    Spring Boot equivalent:
+    @PostMapping("/bulk")
+    public BulkResultDTO bulkCreate(@RequestBody List<BookCreateDTO> books)
+
+    One multi-row INSERT per 1000-row page instead of one statement per
+    book - the difference between minutes and hours on a large import.
+    """
+    inserted = await crud.bulk_create_books(db, books=books)
+    return {"inserted": inserted}
 
 # PUT /books/{book_id} - Update a book
 @router.put("/{book_id}", response_model=schemas.BookResponse)
-def update_book(
+async def update_book(
     book_id: int,  # Like @PathVariable Long id
     book: schemas.BookUpdate,  # Like @RequestBody BookUpdateDTO
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing book
@@ -80,7 +168,7 @@ def update_book(
         @RequestBody BookUpdateDTO bookDto
     )
     """
-    updated_book = book_repository.update_book(db, book_id=book_id, book=book)
+    updated_book = await crud.update_book(db, book_id=book_id, book=book)
     if updated_book is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,9 +178,9 @@ def update_book(
 
 # DELETE /books/{book_id} - Delete a book
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_book(
+async def delete_book(
     book_id: int,  # Like @PathVariable Long id
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a book
@@ -102,7 +190,7 @@ def delete_book(
     @ResponseStatus(HttpStatus.NO_CONTENT)
     public ResponseEntity<Void> deleteBook(@PathVariable Long id)
     """
-    success = book_repository.delete_book(db, book_id=book_id)
+    success = await crud.delete_book(db, book_id=book_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,32 +198,14 @@ def delete_book(
         )
     # FastAPI automatically returns 204 No Content for None return
     return None
-# GET /books/search?q=term - Search books
-@router.get("/search", response_model=List[schemas.BookResponse])
-def search_books(
-    q: str,  # Like @RequestParam String query
-    db: Session = Depends(get_db)
-):
-    """
-    Search books by title or author
-
-    Spring Boot equivalent:
-    @GetMapping("/search")
-    public List<BookDTO> searchBooks(@RequestParam String q)
-    """
-    if len(q.strip()) < 2:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Search query must be at least 2 characters long"
-        )
-
-    return book_repository.search_books(db, search_term=q)
 
 # GET /books/isbn/{isbn} - Get book by ISBN
 @router.get("/isbn/{isbn}", response_model=schemas.BookResponse)
-def get_book_by_isbn(
+async def get_book_by_isbn(
     isbn: str,  # Like @PathVariable String isbn
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a book by its ISBN
@@ -144,32 +214,20 @@ def get_book_by_isbn(
     @GetMapping("/isbn/{isbn}")
     public ResponseEntity<BookDTO> getBookByIsbn(@PathVariable String isbn)
     """
-    book = book_repository.get_book_by_isbn(db, isbn=isbn)
+    book = await crud.get_book_by_isbn(db, isbn=isbn)
     if book is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Book with ISBN {isbn} not found"
         )
+    # Conditional GET: matching If-None-Match skips serialization entirely
+    etag = _book_etag(book)
+    if request.headers.get("if-none-match") == etag:
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
     return book
 
-# GET /books/stats - Get book statistics (bonus endpoint)
-@router.get("/stats")
-def get_book_stats(db: Session = Depends(get_db)):
-    """
-    Get basic statistics about books
-
-    Spring Boot equivalent:
-    @GetMapping("/stats")
-    public BookStatsDTO getBookStats()
-    """
-    total_books = len(book_repository.get_all_books(db, skip=0, limit=10000))
-
-    return {
-        "total_books": total_books,
-        "message": f"Database contains {total_books} books"
-    }
-
-
 """
 ## Key Routing Concepts Explained:
 
@@ -1,13 +1,22 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from datetime import datetime
+from typing import List, Optional
 
 class BookBase (BaseModel):
   #  Base schema with common fields
     #Like your base DTO class in Java
-    
+
+    # str_strip_whitespace: ' 9780441013593 ' would otherwise slip past the
+    # UNIQUE constraint as a different ISBN; validate_assignment stays off -
+    # DTOs are never mutated after parsing, so re-validation is wasted work
+    model_config = ConfigDict(validate_assignment=False, str_strip_whitespace=True)
+
     title : str = Field(..., min_length=1, max_length=200, description = "Book Title")
     author: str = Field(..., min_length=1, max_length=100, description = "Book Author")
-    isbn :  Optional[str] = Field(None, min_length=10, max_length=13, description= "ISBN Number")
+    # One compiled-regex match instead of per-character length walks; bad
+    # ISBNs fail here before costing a DB round-trip. ISBN-10 allows an 'X'
+    # check digit (e.g. 043942089X); ISBN-13 is all digits
+    isbn :  Optional[str] = Field(None, pattern=r"^(\d{9}[\dXx]|\d{13})$", description= "ISBN Number")
     published_year: Optional[int] = Field(None, ge=1000, le=2030, description = "Year Published")
 
 class BookCreate(BookBase):
@@ -22,7 +31,7 @@ class BookUpdate(BookBase):
     #All fields are optional for partial updates
     title: Optional[str] = Field(None, min_length=1, max_length=200, description = "Book Title")
     author: Optional[str] = Field(None, min_length=1, max_length=100, description = "Book Author")
-    isbn: Optional[str] = Field(None, min_length=10, max_length=13, description= "ISBN Number")
+    isbn: Optional[str] = Field(None, pattern=r"^(\d{9}[\dXx]|\d{13})$", description= "ISBN Number")
     published_year: Optional[int] = Field(None, ge=1000, le=2030, description = "Year Published")
 
 class BookResponse  (BookBase):
@@ -30,9 +39,27 @@ class BookResponse  (BookBase):
     #Like: @ResponseBody BookDTO
     #Includes id from Book model
     id: int
+    updated_at: Optional[datetime] = None  # Drives the ETag on by-key GETs
+
+    # Pydantic v2 style config - converts SQLAlchemy model to Pydantic automatically
+    # frozen=True: responses are read-only snapshots; extra='ignore' drops any
+    # unmapped ORM attributes instead of erroring
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+class BookListResponse(BaseModel):
+    #Schema for paginated book listings (GET /books)
+    #Like: Page<BookDTO> from Spring Data
+    #Pass next_after_id back as ?after_id=... to fetch the next page
+    items: List[BookResponse]
+    next_after_id: Optional[int] = None
+
+# Batched list serializer - validates and dumps a whole page of rows in two
+# pydantic-core (Rust) calls instead of Python-level per-row model_validate
+BOOKS_ADAPTER = TypeAdapter(List[BookResponse])
 
-    class Config:
-        from_attributes = True # Like @JsonFormat(shape=JsonFormat.Shape.STRING)  # Converts SQLAlchemy model to Pydantic automatically
+def serialize_books(rows) -> List[dict]:
+    """Turn a list of ORM rows into JSON-ready dicts in one batched pass."""
+    return BOOKS_ADAPTER.dump_python(BOOKS_ADAPTER.validate_python(rows), mode="json")
 
 ## Key Concepts:
 """